@@ -10,7 +10,7 @@ echo "📊 Installing System Monitor (Secure Version)..."
 # Configuration
 REPO="Bilhelm/system-monitor"
 FILE="system_monitor.py"
-EXPECTED_CHECKSUM="d1d50b659198eb976b74a76765cd1860c7595840ea3d9391c2c0fecabc48e3c5"
+EXPECTED_CHECKSUM="dbbd8cf339865a14ec999fa4063ceaf8c38920ebdeabb1d27e71ba59e38eabd3"
 INSTALL_DIR="$HOME/bin"
 TEMP_FILE="/tmp/${FILE}.tmp"
 